@@ -33,4 +33,11 @@ async def query_dict(value: str) -> D:
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, interface="asgi3", port=65432)
+    uvicorn.run(
+        app,
+        interface="asgi3",
+        port=65432,
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=75,
+    )
@@ -5,7 +5,10 @@ from typing_extensions import TypedDict
 
 from rpcpy.client import Client
 
-app = Client(httpx.Client(), base_url="http://127.0.0.1:65432/")
+app = Client(
+    httpx.Client(limits=httpx.Limits(max_keepalive_connections=100, keepalive_expiry=60)),
+    base_url="http://127.0.0.1:65432/",
+)
 
 
 @app.remote_call
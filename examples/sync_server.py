@@ -33,4 +33,4 @@ def query_dict(value: str) -> D:
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, interface="wsgi", port=65432)
+    uvicorn.run(app, interface="wsgi", port=65432, timeout_keep_alive=75)
@@ -2,11 +2,15 @@ from __future__ import annotations
 
 import copy
 import inspect
-import json
 import sys
 import typing
-from base64 import b64encode
 from collections.abc import AsyncGenerator, Generator
+from types import MappingProxyType
+
+try:
+    from pybase64 import b64encode
+except ImportError:  # pragma: no cover
+    from base64 import b64encode  # type: ignore
 
 if sys.version_info[:2] < (3, 8):
     from typing_extensions import Literal, TypedDict
@@ -35,9 +39,11 @@ from rpcpy.openapi import TEMPLATE as OPENAPI_TEMPLATE
 from rpcpy.openapi import (
     ValidationError,
     create_model,
+    is_flat_model,
     is_typed_dict_type,
     parse_typed_dict,
     set_type_model,
+    split_model_schema,
 )
 from rpcpy.serializers import (
     SERIALIZER_NAMES,
@@ -47,11 +53,31 @@ from rpcpy.serializers import (
     get_serializer,
 )
 
+if typing.TYPE_CHECKING:
+    from pydantic import BaseModel
+
 __all__ = ["RPC", "WsgiRPC", "AsgiRPC"]
 
 Callable = typing.TypeVar("Callable", bound=typing.Callable)
 
 
+OPENAPI_HTML = OPENAPI_TEMPLATE.encode("utf8")
+
+RPC_HEADER_NAMES = frozenset((b"serializer", b"content-type", b"content-length"))
+
+
+class Handler(typing.NamedTuple):
+    """
+    Everything `__call__` needs to know about a callback, collected in `register`
+    """
+
+    callback: typing.Callable
+    body_model: typing.Optional[typing.Type[BaseModel]]
+    flat_body: bool
+    streaming: bool
+    return_annotation: typing.Any
+
+
 class RPCMeta(type):
     def __call__(cls, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
         mode = kwargs.get("mode", "WSGI")
@@ -71,6 +97,23 @@ OpenAPI = TypedDict("OpenAPI", {"title": str, "description": str, "version": str
 
 
 class RPC(metaclass=RPCMeta):
+    __slots__ = (
+        "callbacks",
+        "prefix",
+        "response_serializer",
+        "openapi",
+        "_callbacks",
+        "_handlers",
+        "_response_headers",
+        "_exception_headers",
+        "_event_headers",
+        "_openapi_docs",
+        "_openapi_html_path",
+        "_openapi_json_path",
+    )
+
+    response_class: typing.Type[WsgiResponse] | typing.Type[AsgiResponse]
+
     def __init__(
         self,
         *,
@@ -80,14 +123,45 @@ class RPC(metaclass=RPCMeta):
         openapi: typing.Optional[OpenAPI] = None,
     ) -> None:
         assert prefix.startswith("/") and prefix.endswith("/")
-        self.callbacks: typing.Dict[str, typing.Callable] = {}
+        self._callbacks: typing.Dict[str, typing.Callable] = {}
+        # Requests are dispatched through `_handlers`, callbacks can only be
+        # added with `register`, so `callbacks` is a read-only view.
+        self.callbacks: typing.Mapping[str, typing.Callable] = MappingProxyType(
+            self._callbacks
+        )
+        self._handlers: typing.Dict[str, Handler] = {}
         self.prefix = prefix
         self.response_serializer = response_serializer
         self.openapi = openapi
+        # Shared by every response, so keep them read-only.
+        self._response_headers = MappingProxyType(
+            {
+                "content-type": response_serializer.content_type,
+                "serializer": response_serializer.name,
+            }
+        )
+        self._exception_headers = MappingProxyType(
+            {**self._response_headers, "callback-status": "exception"}
+        )
+        self._event_headers = MappingProxyType(
+            {"serializer-base": "base64", "serializer": response_serializer.name}
+        )
+        self._openapi_docs: typing.Optional[bytes] = None
+        self._openapi_html_path = prefix + "openapi-docs"
+        self._openapi_json_path = prefix + "get-openapi-docs"
 
     def register(self, func: Callable) -> Callable:
-        self.callbacks[func.__name__] = func
+        self._callbacks[func.__name__] = func
         set_type_model(func)
+        body_model = getattr(func, "__body_model__", None)
+        self._handlers[self.prefix + func.__name__] = Handler(
+            func,
+            body_model,
+            body_model is not None and is_flat_model(body_model),
+            inspect.isgeneratorfunction(func) or inspect.isasyncgenfunction(func),
+            inspect.signature(func).return_annotation,
+        )
+        self._openapi_docs = None
         return func
 
     def get_openapi_docs(self) -> dict:
@@ -98,10 +172,11 @@ class RPC(metaclass=RPCMeta):
         }
         openapi["definitions"] = definitions = {}
 
-        for name, callback in self.callbacks.items():
+        for path, handler in self._handlers.items():
+            name = handler.callback.__name__
             _ = {}
             # summary and description
-            doc = callback.__doc__
+            doc = handler.callback.__doc__
             if isinstance(doc, str):
                 _.update(
                     zip(
@@ -134,11 +209,9 @@ class RPC(metaclass=RPCMeta):
                 },
             ]
             # request body
-            body_model = getattr(callback, "__body_model__", None)
-            if body_model:
-                _schema = copy.deepcopy(body_model.schema())
-                definitions.update(_schema.pop("definitions", {}))
-                del _schema["title"]
+            if handler.body_model is not None:
+                _schema, _definitions = split_model_schema(handler.body_model)
+                definitions.update(_definitions)
                 _["requestBody"] = {
                     "required": True,
                     "content": {
@@ -147,11 +220,10 @@ class RPC(metaclass=RPCMeta):
                     },
                 }
             # response & only 200
-            sig = inspect.signature(callback)
-            if sig.return_annotation != sig.empty:
+            return_annotation = handler.return_annotation
+            if return_annotation is not inspect.Signature.empty:
                 content_type = self.response_serializer.content_type
-                return_annotation = sig.return_annotation
-                if getattr(sig.return_annotation, "__origin__", None) in (
+                if getattr(return_annotation, "__origin__", None) in (
                     Generator,
                     AsyncGenerator,
                 ):
@@ -160,15 +232,14 @@ class RPC(metaclass=RPCMeta):
                 if is_typed_dict_type(return_annotation):
                     resp_model = parse_typed_dict(return_annotation)
                 elif return_annotation is None:
-                    resp_model = create_model(callback.__name__ + "-return")
+                    resp_model = create_model(name + "-return")
                 else:
                     resp_model = create_model(
-                        callback.__name__ + "-return",
+                        name + "-return",
                         __root__=(return_annotation, ...),
                     )
-                _schema = copy.deepcopy(resp_model.schema())
-                definitions.update(_schema.pop("definitions", {}))
-                del _schema["title"]
+                _schema, _definitions = split_model_schema(resp_model)
+                definitions.update(_definitions)
                 _["responses"] = {
                     200: {
                         "content": {content_type: {"schema": _schema}},
@@ -184,47 +255,40 @@ class RPC(metaclass=RPCMeta):
                     }
                 }
             if _:
-                openapi["paths"][f"{self.prefix}{name}"] = {"post": _}
+                openapi["paths"][path] = {"post": _}
         return openapi
 
     @typing.overload
-    def return_response_class(self, request: WsgiRequest) -> typing.Type[WsgiResponse]:
-        pass
-
-    @typing.overload
-    def return_response_class(self, request: AsgiRequest) -> typing.Type[AsgiResponse]:
-        pass
-
-    def return_response_class(self, request):
-        return AsgiResponse if isinstance(request, AsgiRequest) else WsgiResponse
-
-    @typing.overload
-    def respond_openapi(self, request: WsgiRequest) -> WsgiResponse | None:
+    def respond_openapi(self, request: WsgiRequest, path: str) -> WsgiResponse | None:
         pass
 
     @typing.overload
-    def respond_openapi(self, request: AsgiRequest) -> AsgiResponse | None:
+    def respond_openapi(self, request: AsgiRequest, path: str) -> AsgiResponse | None:
         pass
 
-    def respond_openapi(self, request):
-        response_class = self.return_response_class(request)
+    def respond_openapi(self, request, path):
+        response_class = self.response_class
 
         if self.openapi is not None and request.method == "GET":
-            if request.url.path[len(self.prefix) :] == "openapi-docs":
-                return response_class(OPENAPI_TEMPLATE, media_type="text/html")
-            elif request.url.path[len(self.prefix) :] == "get-openapi-docs":
-                return response_class(
-                    json.dumps(self.get_openapi_docs(), ensure_ascii=False),
-                    media_type="application/json",
-                )
+            if path == self._openapi_html_path:
+                return response_class(OPENAPI_HTML, media_type="text/html")
+            elif path == self._openapi_json_path:
+                if self._openapi_docs is None:
+                    self._openapi_docs = JSONSerializer().encode(self.get_openapi_docs())
+                return response_class(self._openapi_docs, media_type="application/json")
 
         return None
 
     def preprocess(
-        self, request: WsgiRequest | AsgiRequest
-    ) -> typing.Tuple[BaseSerializer, typing.Callable]:
+        self,
+        request: WsgiRequest | AsgiRequest,
+        path: str,
+        headers: typing.Mapping[str, str],
+    ) -> typing.Tuple[BaseSerializer, Handler]:
         """
         Preprocess request
+
+        `headers` only needs to carry `serializer` and `content-type`.
         """
         # check request method
         if request.method != "POST":
@@ -232,19 +296,19 @@ class RPC(metaclass=RPCMeta):
 
         # check serializer
         try:
-            serializer = get_serializer(request.headers)
+            serializer = get_serializer(headers)
         except SerializerNotFound as exception:
             raise CallbackError(content=str(exception), status_code=415)
 
         # check callback
-        callback = self.callbacks.get(request.url.path[len(self.prefix) :], None)
-        if callback is None:
+        handler = self._handlers.get(path, None)
+        if handler is None:
             raise CallbackError(content="", status_code=404)
 
-        return serializer, callback
+        return serializer, handler
 
     def preprocess_body(
-        self, serializer: BaseSerializer, callback: typing.Callable, body: bytes
+        self, serializer: BaseSerializer, handler: Handler, body: bytes
     ) -> typing.Dict[str, typing.Any]:
         """
         Preprocess request body
@@ -254,16 +318,17 @@ class RPC(metaclass=RPCMeta):
         else:
             data = serializer.decode(body)
 
-        if hasattr(callback, "__body_model__"):
+        if handler.body_model is not None:
             try:
-                model = getattr(callback, "__body_model__")(**data)
+                model = handler.body_model(**data)
             except ValidationError as exception:
                 raise CallbackError(
                     status_code=422,
                     headers={"content-type": "application/json"},
                     content=exception.json(),
                 )
-            data = model.dict()
+            # `.dict()` recursively copies, only needed for nested models
+            data = dict(model) if handler.flat_body else model.dict()
 
         return data
 
@@ -274,6 +339,10 @@ class RPC(metaclass=RPCMeta):
 
 
 class WsgiRPC(RPC):
+    __slots__ = ()
+
+    response_class = WsgiResponse
+
     def register(self, func: Callable) -> Callable:
         if inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func):
             raise TypeError("WSGI mode can only register synchronization functions.")
@@ -282,59 +351,70 @@ class WsgiRPC(RPC):
     def create_generator(
         self, generator: typing.Generator
     ) -> typing.Generator[ServerSentEvent, None, None]:
+        encode = self.response_serializer.encode
         try:
             for data in generator:
-                yield {
-                    "event": "yield",
-                    "data": b64encode(self.response_serializer.encode(data)).decode(
-                        "ascii"
-                    ),
-                }
+                yield {"event": "yield", "data": b64encode(encode(data)).decode("ascii")}
         except Exception as exception:
-            yield {
-                "event": "exception",
-                "data": b64encode(self.format_exception(exception)).decode("ascii"),
-            }
+            message = b64encode(self.format_exception(exception)).decode("ascii")
+            yield {"event": "exception", "data": message}
 
     def on_call(
-        self,
-        callback: typing.Callable[..., typing.Any],
-        data: typing.Dict[str, typing.Any],
+        self, handler: Handler, data: typing.Dict[str, typing.Any]
     ) -> WsgiResponse | WsgiEventResponse:
         response: WsgiResponse | WsgiEventResponse
         try:
-            result = callback(**data)
+            result = handler.callback(**data)
         except Exception as exception:
             message = self.format_exception(exception)
-            response = WsgiResponse(
-                message,
-                headers={
-                    "content-type": self.response_serializer.content_type,
-                    "callback-status": "exception",
-                },
-            )
+            response = WsgiResponse(message, headers=self._exception_headers)
         else:
-            if inspect.isgenerator(result):
+            # also check the result, a decorated generator function isn't a
+            # generator function itself
+            if handler.streaming or inspect.isgenerator(result):
                 response = WsgiEventResponse(
-                    self.create_generator(result), headers={"serializer-base": "base64"}
+                    self.create_generator(result), headers=self._event_headers
                 )
             else:
                 response = WsgiResponse(
                     self.response_serializer.encode(result),
-                    headers={"content-type": self.response_serializer.content_type},
+                    headers=self._response_headers,
                 )
 
         return response
 
+    @staticmethod
+    def read_headers(environ: Environ) -> typing.Dict[str, str]:
+        """
+        Read the headers used by RPC straight from environ
+        """
+        return {
+            "serializer": environ.get("HTTP_SERIALIZER", ""),
+            "content-type": environ.get("CONTENT_TYPE", ""),
+        }
+
     def __call__(
         self, environ: Environ, start_response: StartResponse
     ) -> typing.Iterable[bytes]:
         request = WsgiRequest(environ)
-        response: WSGIApp | None = self.respond_openapi(request)
+        path = (
+            (environ.get("SCRIPT_NAME", "") + environ.get("PATH_INFO", ""))
+            .encode("latin-1")
+            .decode("utf8")
+        )
+        response: WSGIApp | None = None
+        if request.method != "POST":
+            response = self.respond_openapi(request, path)
         if response is None:
             try:
-                serializer, callback = self.preprocess(request)
-                data = self.preprocess_body(serializer, callback, request.body)
+                serializer, handler = self.preprocess(
+                    request, path, self.read_headers(environ)
+                )
+                if environ.get("CONTENT_LENGTH") == "0":
+                    body = b""
+                else:
+                    body = request.body
+                data = self.preprocess_body(serializer, handler, body)
             except CallbackError as exception:
                 response = WsgiResponse(
                     content=exception.content or b"",
@@ -342,12 +422,15 @@ class WsgiRPC(RPC):
                     headers=exception.headers,
                 )
             else:
-                response = self.on_call(callback, data)
-                response.headers["serializer"] = self.response_serializer.name
+                response = self.on_call(handler, data)
         return response(environ, start_response)
 
 
 class AsgiRPC(RPC):
+    __slots__ = ()
+
+    response_class = AsgiResponse
+
     def register(self, func: Callable) -> Callable:
         if not (inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func)):
             raise TypeError("ASGI mode can only register asynchronous functions.")
@@ -356,60 +439,65 @@ class AsgiRPC(RPC):
     async def create_generator(
         self, generator: typing.AsyncGenerator
     ) -> typing.AsyncGenerator[ServerSentEvent, None]:
+        encode = self.response_serializer.encode
         try:
             async for data in generator:
-                yield {
-                    "event": "yield",
-                    "data": b64encode(self.response_serializer.encode(data)).decode(
-                        "ascii"
-                    ),
-                }
+                yield {"event": "yield", "data": b64encode(encode(data)).decode("ascii")}
         except Exception as exception:
-            yield {
-                "event": "exception",
-                "data": b64encode(self.format_exception(exception)).decode("ascii"),
-            }
+            message = b64encode(self.format_exception(exception)).decode("ascii")
+            yield {"event": "exception", "data": message}
 
     async def on_call(
-        self,
-        callback: typing.Callable[..., typing.Awaitable[typing.Any]],
-        data: typing.Dict[str, typing.Any],
+        self, handler: Handler, data: typing.Dict[str, typing.Any]
     ) -> AsgiResponse | AsgiEventResponse:
         response: AsgiResponse | AsgiEventResponse
         try:
-            if inspect.isasyncgenfunction(callback):
-                result = callback(**data)
+            if handler.streaming:
+                result = handler.callback(**data)
             else:
-                result = await callback(**data)
+                result = await handler.callback(**data)
         except Exception as exception:
             message = self.format_exception(exception)
-            response = AsgiResponse(
-                message,
-                headers={
-                    "content-type": self.response_serializer.content_type,
-                    "callback-status": "exception",
-                },
-            )
+            response = AsgiResponse(message, headers=self._exception_headers)
         else:
-            if inspect.isasyncgen(result):
+            if handler.streaming or inspect.isasyncgen(result):
                 response = AsgiEventResponse(
-                    self.create_generator(result), headers={"serializer-base": "base64"}
+                    self.create_generator(result), headers=self._event_headers
                 )
             else:
                 response = AsgiResponse(
                     self.response_serializer.encode(result),
-                    headers={"content-type": self.response_serializer.content_type},
+                    headers=self._response_headers,
                 )
 
         return response
 
+    @staticmethod
+    def read_headers(scope: Scope) -> typing.Dict[str, str]:
+        """
+        Read the headers used by RPC straight from scope
+        """
+        headers = {}
+        for key, value in scope["headers"]:
+            if key in RPC_HEADER_NAMES:
+                headers[key.decode("latin-1")] = value.decode("latin-1")
+        return headers
+
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         request = AsgiRequest(scope, receive, send)
-        response: ASGIApp | None = self.respond_openapi(request)
+        path = scope.get("root_path", "") + scope["path"]
+        response: ASGIApp | None = None
+        if request.method != "POST":
+            response = self.respond_openapi(request, path)
         if response is None:
             try:
-                serializer, callback = self.preprocess(request)
-                data = self.preprocess_body(serializer, callback, await request.body)
+                headers = self.read_headers(scope)
+                serializer, handler = self.preprocess(request, path, headers)
+                if headers.get("content-length") == "0":
+                    body = b""
+                else:
+                    body = await request.body
+                data = self.preprocess_body(serializer, handler, body)
             except CallbackError as exception:
                 response = AsgiResponse(
                     content=exception.content or b"",
@@ -417,6 +505,5 @@ class AsgiRPC(RPC):
                     headers=exception.headers,
                 )
             else:
-                response = await self.on_call(callback, data)
-                response.headers["serializer"] = self.response_serializer.name
+                response = await self.on_call(handler, data)
         return await response(scope, receive, send)
@@ -3,10 +3,14 @@ from __future__ import annotations
 import functools
 import inspect
 import typing
-from base64 import b64decode
 
 import httpx
 
+try:
+    from pybase64 import b64decode
+except ImportError:  # pragma: no cover
+    from base64 import b64decode  # type: ignore
+
 from rpcpy.exceptions import RemoteCallError
 from rpcpy.openapi import validate_arguments
 from rpcpy.serializers import BaseSerializer, JSONSerializer, get_serializer
@@ -51,15 +55,23 @@ class Client(metaclass=ClientMeta):
     def remote_call(self, func: Callable) -> Callable:
         return func
 
-    def _get_url(self, func: typing.Callable) -> str:
-        return self.base_url + func.__name__
+    def _get_url(self, func: typing.Callable) -> httpx.URL:
+        # parsed once here, httpx reuses a `URL` object as is on every request
+        return httpx.URL(self.base_url + func.__name__)
+
+    def _get_headers(self) -> httpx.Headers:
+        return httpx.Headers(
+            {
+                "content-type": self.request_serializer.content_type,
+                "serializer": self.request_serializer.name,
+            }
+        )
 
     def _get_content(
-        self, func: typing.Callable, *args: typing.Any, **kwargs: typing.Any
+        self, sig: inspect.Signature, *args: typing.Any, **kwargs: typing.Any
     ) -> bytes:
-        sig = inspect.signature(func)
         bound_values = sig.bind(*args, **kwargs)
-        parameters = dict(**bound_values.arguments)
+        parameters = dict(bound_values.arguments)
         if parameters:
             return self.request_serializer.encode(parameters)
         else:
@@ -78,20 +90,19 @@ class AsyncClient(Client):
 
         func = super().remote_call(func)
         url = self._get_url(func)
+        sig = inspect.signature(func)
+        headers = self._get_headers()
 
         if not inspect.isasyncgenfunction(func):
 
             @validate_arguments
             @functools.wraps(func)
             async def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
-                post_content = self._get_content(func, *args, **kwargs)
+                post_content = self._get_content(sig, *args, **kwargs)
                 resp = await self.client.post(
                     url,
                     content=post_content,
-                    headers={
-                        "content-type": self.request_serializer.content_type,
-                        "serializer": self.request_serializer.name,
-                    },
+                    headers=headers,
                 )
                 resp.raise_for_status()
                 content = get_serializer(resp.headers).decode(resp.content)
@@ -105,15 +116,12 @@ class AsyncClient(Client):
             @validate_arguments
             @functools.wraps(func)
             async def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
-                post_content = self._get_content(func, *args, **kwargs)
+                post_content = self._get_content(sig, *args, **kwargs)
                 async with self.client.stream(
                     "POST",
                     url,
                     content=post_content,
-                    headers={
-                        "content-type": self.request_serializer.content_type,
-                        "serializer": self.request_serializer.name,
-                    },
+                    headers=headers,
                 ) as resp:
                     resp.raise_for_status()
                     sse_parser = ServerSentEventsParser()
@@ -124,12 +132,10 @@ class AsyncClient(Client):
                             continue
 
                         if event["event"] == "yield":
-                            yield serializer.decode(
-                                b64decode(event["data"].encode("ascii"))
-                            )
+                            yield serializer.decode(b64decode(event["data"]))
                         elif event["event"] == "exception":
                             raise RemoteCallError(
-                                serializer.decode(b64decode(event["data"].encode("ascii")))
+                                serializer.decode(b64decode(event["data"]))
                             )
                         else:
                             raise RuntimeError(f"Unknown event type: {event['event']}")
@@ -149,20 +155,19 @@ class SyncClient(Client):
 
         func = super().remote_call(func)
         url = self._get_url(func)
+        sig = inspect.signature(func)
+        headers = self._get_headers()
 
         if not inspect.isgeneratorfunction(func):
 
             @validate_arguments
             @functools.wraps(func)
             def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
-                post_content = self._get_content(func, *args, **kwargs)
+                post_content = self._get_content(sig, *args, **kwargs)
                 resp = self.client.post(
                     url,
                     content=post_content,
-                    headers={
-                        "content-type": self.request_serializer.content_type,
-                        "serializer": self.request_serializer.name,
-                    },
+                    headers=headers,
                 )
                 resp.raise_for_status()
                 content = get_serializer(resp.headers).decode(resp.content)
@@ -176,15 +181,12 @@ class SyncClient(Client):
             @validate_arguments
             @functools.wraps(func)
             def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
-                post_content = self._get_content(func, *args, **kwargs)
+                post_content = self._get_content(sig, *args, **kwargs)
                 with self.client.stream(
                     "POST",
                     url,
                     content=post_content,
-                    headers={
-                        "content-type": self.request_serializer.content_type,
-                        "serializer": self.request_serializer.name,
-                    },
+                    headers=headers,
                 ) as resp:
                     resp.raise_for_status()
                     sse_parser = ServerSentEventsParser()
@@ -195,12 +197,10 @@ class SyncClient(Client):
                             continue
 
                         if event["event"] == "yield":
-                            yield serializer.decode(
-                                b64decode(event["data"].encode("ascii"))
-                            )
+                            yield serializer.decode(b64decode(event["data"]))
                         elif event["event"] == "exception":
                             raise RemoteCallError(
-                                serializer.decode(b64decode(event["data"].encode("ascii")))
+                                serializer.decode(b64decode(event["data"]))
                             )
                         else:
                             raise RuntimeError(f"Unknown event type: {event['event']}")
@@ -211,33 +211,38 @@ class SyncClient(Client):
 class ServerSentEventsParser:
     def __init__(self) -> None:
         self.message: ServerSentEvent = {}
+        # multi-line data is joined once, when the event is complete
+        self.data: typing.List[str] = []
 
     def feed(self, line: str) -> ServerSentEvent | None:
         if line == "\n":  # event split line
             event = self.message
+            if self.data:
+                event["data"] = "\n".join(self.data)
+                self.data = []
             self.message = {}
             return event
 
-        if line[0] == ":":  # ignore comment
+        index = line.find(":")
+        if index == 0:  # ignore comment
             return None
 
-        try:
-            key, value = map(str.strip, line.split(":", maxsplit=1))
-        except ValueError:
+        if index == -1:
             key = line.strip()
             value = ""
+        else:
+            key = line[:index].strip()
+            value = line[index + 1 :].strip()
 
-        if key not in ("data", "event", "id", "retry"):  # ignore undefined key
-            return None
-
-        if key == "data" and key in self.message:
-            self.message["data"] = f'{self.message["data"]}\n{value}'
+        if key == "data":
+            self.data.append(value)
+        elif key == "event" or key == "id":
+            self.message[key] = value  # type: ignore[literal-required]
         elif key == "retry":
             try:
                 self.message["retry"] = int(value)
             except ValueError:
                 pass  # ignore non-integer retry value
-        else:
-            self.message[key] = value  # type: ignore[literal-required]
+        # ignore undefined key
 
         return None
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import copy
+import datetime
+import decimal
+import enum
 import functools
 import inspect
+import pathlib
 import typing
+import uuid
 import warnings
 
 __all__ = [
@@ -11,6 +17,8 @@ __all__ = [
     "set_type_model",
     "is_typed_dict_type",
     "parse_typed_dict",
+    "split_model_schema",
+    "is_flat_model",
     "TEMPLATE",
 ]
 
@@ -111,6 +119,58 @@ def parse_typed_dict(typed_dict) -> typing.Type[BaseModel]:
     return create_model(typed_dict.__name__, **annotations)  # type: ignore
 
 
+def split_model_schema(
+    model: typing.Type[BaseModel],
+) -> typing.Tuple[typing.Dict[str, typing.Any], typing.Dict[str, typing.Any]]:
+    """
+    split a copy of `model.schema()` into the schema without title and its definitions
+
+    pydantic caches the returned dict, copy it so that neither this function nor
+    the caller of `get_openapi_docs` can modify that cache.
+    """
+    schema = copy.deepcopy(model.schema())
+    definitions = schema.pop("definitions", {})
+    schema.pop("title", None)
+    return schema, definitions
+
+
+# field types whose values `model.dict()` returns as is
+FLAT_FIELD_TYPES = (
+    str,
+    bytes,
+    int,
+    float,
+    bool,
+    decimal.Decimal,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    uuid.UUID,
+    enum.Enum,
+    pathlib.PurePath,
+    type(None),
+)
+
+
+def is_flat_model(model: typing.Type[BaseModel]) -> bool:
+    """
+    whether `dict(instance)` gives the same result as `instance.dict()`
+
+    Only fields of a known scalar type count, anything that could hold a model
+    at runtime (`Any`, `object`, `dict`, `Type[...]`, containers) doesn't.
+    """
+    for field in model.__fields__.values():
+        # containers (List[...], Dict[...], Union[...]) differ in `outer_type_`
+        # or have `sub_fields`
+        if field.outer_type_ is not field.type_ or field.sub_fields:
+            return False
+        if not (
+            isinstance(field.type_, type) and issubclass(field.type_, FLAT_FIELD_TYPES)
+        ):
+            return False
+    return True
+
+
 TEMPLATE = """<!DOCTYPE html>
 <html>
 
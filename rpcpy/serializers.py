@@ -1,8 +1,21 @@
+import functools
 import json
 import pickle
 import typing
 from abc import ABCMeta, abstractmethod
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+else:
+    _ORJSON_OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_PASSTHROUGH_SUBCLASS
+        | orjson.OPT_SERIALIZE_NUMPY
+    )
+
 try:
     import msgpack
 except ImportError:  # pragma: no cover
@@ -33,7 +46,22 @@ class BaseSerializer(metaclass=ABCMeta):
         raise NotImplementedError()
 
 
+def _orjson_default(obj: typing.Any) -> typing.NoReturn:
+    raise TypeError
+
+
 class JSONSerializer(BaseSerializer):
+    """
+    JSON: encode with orjson (https://github.com/ijl/orjson) when it is
+    installed, falling back to `json` for anything orjson can't encode on its
+    own: values for `default_encode` (datetime, dataclasses and subclasses of
+    builtin types included), integers out of 64-bit range and non-str keys.
+    Decoding always uses `json`.
+
+    With orjson, NaN and Infinity are encoded as null, UUIDs, enums and numpy
+    values are encoded natively without calling `default_encode`.
+    """
+
     name = "json"
     content_type = "application/json"
 
@@ -46,6 +74,11 @@ class JSONSerializer(BaseSerializer):
         self.default_decode = default_decode
 
     def encode(self, data: typing.Any) -> bytes:
+        if orjson is not None:
+            try:
+                return orjson.dumps(data, default=_orjson_default, option=_ORJSON_OPTIONS)
+            except TypeError:
+                pass  # let `json` and `default_encode` try it
         return json.dumps(
             data,
             ensure_ascii=False,
@@ -53,6 +86,8 @@ class JSONSerializer(BaseSerializer):
         ).encode("utf8")
 
     def decode(self, data: bytes) -> typing.Any:
+        # orjson.loads turns integers out of 64-bit range into floats and
+        # rejects NaN/Infinity, so it isn't used here
         return json.loads(
             data.decode("utf8"),
             object_hook=self.default_decode,
@@ -60,11 +95,20 @@ class JSONSerializer(BaseSerializer):
 
 
 class PickleSerializer(BaseSerializer):
+    """
+    Pickle: `protocol` defaults to `pickle.DEFAULT_PROTOCOL`, so peers on older
+    Pythons can still load it. Pass `pickle.HIGHEST_PROTOCOL` when both ends
+    run the same Python to get the newest, usually fastest, protocol.
+    """
+
     name = "pickle"
     content_type = "application/x-pickle"
 
+    def __init__(self, protocol: int = pickle.DEFAULT_PROTOCOL) -> None:
+        self.protocol = protocol
+
     def encode(self, data: typing.Any) -> bytes:
-        return pickle.dumps(data)
+        return pickle.dumps(data, protocol=self.protocol)
 
     def decode(self, data: bytes) -> typing.Any:
         return pickle.loads(data)
@@ -132,17 +176,30 @@ def get_serializer(headers: typing.Mapping) -> BaseSerializer:
     """
     parse header and try find serializer
     """
-    serializer_name = headers.get("serializer", None)
+    return _get_serializer(
+        headers.get("serializer", None), headers.get("content-type", None)
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _get_serializer(
+    serializer_name: typing.Optional[str], serializer_type: typing.Optional[str]
+) -> BaseSerializer:
+    """
+    A server only ever sees a few distinct header values, so the lookup
+    is memoized. Failed lookups raise and are therefore never cached.
+    """
     if serializer_name:
         if serializer_name not in SERIALIZER_NAMES:
             raise SerializerNotFound(f"Serializer `{serializer_name}` not found")
         return SERIALIZER_NAMES[serializer_name]
 
-    serializer_type = headers.get("content-type", None)
     if serializer_type:
-        if serializer_type not in SERIALIZER_TYPES:
+        # ignore parameters such as `; charset=utf-8`
+        media_type = serializer_type.partition(";")[0].strip()
+        if media_type not in SERIALIZER_TYPES:
             raise SerializerNotFound(f"Serializer for `{serializer_type}` not found")
-        return SERIALIZER_TYPES[serializer_type]
+        return SERIALIZER_TYPES[media_type]
 
     raise SerializerNotFound(
         "You must set a value for header `serializer` or `content-type`"
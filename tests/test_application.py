@@ -1,8 +1,9 @@
 import asyncio
+import functools
 import json
 import sys
 import time
-from typing import AsyncGenerator, Generator
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional, Set, Type
 
 if sys.version_info[:2] < (3, 8):
     from typing_extensions import TypedDict
@@ -13,6 +14,7 @@ import httpx
 import pytest
 
 from rpcpy.application import RPC, AsgiRPC, WsgiRPC
+from rpcpy.openapi import create_model, is_flat_model
 from rpcpy.serializers import SERIALIZER_NAMES, SERIALIZER_TYPES
 
 
@@ -179,6 +181,7 @@ def test_wsgi_openapi():
             time.sleep(1)
 
     assert rpc.get_openapi_docs() == OPENAPI_DOCS
+    assert rpc.get_openapi_docs() == OPENAPI_DOCS  # pydantic's schema cache is intact
 
     with httpx.Client(app=rpc, base_url="http://testServer/") as client:
         assert client.get("/openapi-docs").status_code == 200
@@ -418,3 +421,204 @@ OPENAPI_DOCS = {
         }
     },
 }
+
+
+@pytest.mark.skipif("pydantic" not in sys.modules, reason="Missing pydantic")
+def test_openapi_docs_cache():
+    rpc = RPC(openapi={"title": "Title", "description": "Description", "version": "v1"})
+
+    @rpc.register
+    def sayhi(name: str) -> str:
+        return f"hi {name}"
+
+    with httpx.Client(app=rpc, base_url="http://testServer/") as client:
+        docs = client.get("/get-openapi-docs").json()
+        assert list(docs["paths"].keys()) == ["/sayhi"]
+        assert client.get("/get-openapi-docs").json() == docs
+
+        @rpc.register
+        def saybye(name: str) -> str:
+            return f"bye {name}"
+
+        docs = client.get("/get-openapi-docs").json()
+        assert list(docs["paths"].keys()) == ["/sayhi", "/saybye"]
+
+
+@pytest.mark.skipif("pydantic" not in sys.modules, reason="Missing pydantic")
+def test_openapi_docs_copy():
+    rpc = RPC(openapi={"title": "Title", "version": "v1", "contact": {"name": "Aber"}})
+
+    @rpc.register
+    def sayhi(name: str) -> str:
+        return f"hi {name}"
+
+    docs = rpc.get_openapi_docs()
+    content = docs["paths"]["/sayhi"]["post"]["requestBody"]["content"]
+    content["application/json"]["schema"]["properties"]["name"]["type"] = "MUTATED"
+    docs["info"]["contact"]["name"] = "MUTATED"
+
+    assert sayhi.__body_model__.schema()["properties"]["name"]["type"] == "string"
+    assert rpc.openapi["contact"]["name"] == "Aber"
+    docs = rpc.get_openapi_docs()
+    content = docs["paths"]["/sayhi"]["post"]["requestBody"]["content"]
+    assert content["application/json"]["schema"]["properties"]["name"]["type"] == "string"
+
+
+def test_prefix():
+    rpc = RPC(prefix="/api/")
+
+    @rpc.register
+    def sayhi(name: str) -> str:
+        return f"hi {name}"
+
+    with httpx.Client(app=rpc, base_url="http://testServer/") as client:
+        assert client.post("/api/sayhi", json={"name": "Aber"}).json() == "hi Aber"
+        assert client.post("/sayhi", json={"name": "Aber"}).status_code == 404
+        assert client.post("/other/sayhi", json={"name": "Aber"}).status_code == 404
+
+
+def test_callbacks_read_only():
+    rpc = RPC()
+
+    @rpc.register
+    def sayhi(name: str) -> str:
+        return f"hi {name}"
+
+    assert rpc.callbacks == {"sayhi": sayhi}
+    with pytest.raises(TypeError):
+        rpc.callbacks["sayhi"] = lambda name: name
+
+
+@pytest.mark.skipif("pydantic" not in sys.modules, reason="Missing pydantic")
+def test_body_model_arguments():
+    rpc = RPC()
+
+    class DNSRecord(TypedDict):
+        record: str
+        ttl: int
+
+    @rpc.register
+    def add(a: int, b: int = 1) -> int:
+        return a + b
+
+    @rpc.register
+    def ttl(record: DNSRecord) -> int:
+        assert type(record) is dict
+        return record["ttl"]
+
+    with httpx.Client(app=rpc, base_url="http://testServer/") as client:
+        assert client.post("/add", json={"a": "1"}).json() == 2
+        assert client.post("/add", json={"a": 1, "b": 2}).json() == 3
+        assert client.post("/add", json={"b": 2}).status_code == 422
+        resp = client.post("/ttl", json={"record": {"record": "1.1.1.1", "ttl": "60"}})
+        assert resp.json() == 60
+
+
+@pytest.mark.skipif("pydantic" not in sys.modules, reason="Missing pydantic")
+@pytest.mark.parametrize(
+    "annotation,flat",
+    [
+        (int, True),
+        (str, True),
+        (Optional[float], True),
+        (bytes, True),
+        (Any, False),
+        (object, False),
+        (dict, False),
+        (list, False),
+        (set, False),
+        (Type[int], False),
+        (List[int], False),
+        (Dict[str, int], False),
+        (Set[int], False),
+    ],
+)
+def test_is_flat_model(annotation, flat):
+    model = create_model("model", value=(annotation, ...))
+    assert is_flat_model(model) is flat
+
+
+def test_wsgi_decorated_generator():
+    rpc = RPC()
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    @rpc.register
+    @decorator
+    def count(num: int) -> Generator[int, None, None]:
+        for i in range(num):
+            yield i
+
+    with httpx.Client(app=rpc, base_url="http://testServer/") as client:
+        resp = client.post("/count", json={"num": 2})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        assert resp.text == "event: yield\ndata: MA==\n\nevent: yield\ndata: MQ==\n\n"
+
+
+@pytest.mark.asyncio
+async def test_asgi_decorated_generator():
+    rpc = RPC(mode="ASGI")
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    @rpc.register
+    @decorator
+    async def count(num: int) -> AsyncGenerator[int, None]:
+        for i in range(num):
+            yield i
+
+    async with httpx.AsyncClient(app=rpc, base_url="http://testServer/") as client:
+        resp = await client.post("/count", json={"num": 2})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        assert resp.text == "event: yield\ndata: MA==\n\nevent: yield\ndata: MQ==\n\n"
+
+
+SSE_BODY = (
+    b"event: yield\ndata: IuS4reaWhyI=\n\n"
+    b"event: exception\ndata: IlZhbHVlRXJyb3I6IGJvb20i\n\n"
+)
+
+
+def test_wsgi_sse_wire_format():
+    rpc = RPC()
+
+    @rpc.register
+    def stream() -> Generator[str, None, None]:
+        yield "中文"
+        raise ValueError("boom")
+
+    with httpx.Client(app=rpc, base_url="http://testServer/") as client:
+        resp = client.post("/stream", json={})
+        assert resp.headers["content-type"] == "text/event-stream; charset=utf-8"
+        assert resp.headers["serializer-base"] == "base64"
+        assert resp.headers["serializer"] == "json"
+        assert resp.content == SSE_BODY
+
+
+@pytest.mark.asyncio
+async def test_asgi_sse_wire_format():
+    rpc = RPC(mode="ASGI")
+
+    @rpc.register
+    async def stream() -> AsyncGenerator[str, None]:
+        yield "中文"
+        raise ValueError("boom")
+
+    async with httpx.AsyncClient(app=rpc, base_url="http://testServer/") as client:
+        resp = await client.post("/stream", json={})
+        assert resp.headers["content-type"] == "text/event-stream; charset=utf-8"
+        assert resp.headers["serializer-base"] == "base64"
+        assert resp.headers["serializer"] == "json"
+        assert resp.content == SSE_BODY
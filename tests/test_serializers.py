@@ -1,16 +1,31 @@
+import dataclasses
+import datetime
+import math
+import pickle
+import sys
+import uuid
+
 import pytest
 
+from rpcpy.exceptions import SerializerNotFound
 from rpcpy.serializers import (
     CBORSerializer,
     JSONSerializer,
     MsgpackSerializer,
     PickleSerializer,
+    get_serializer,
 )
 
 
 @pytest.mark.parametrize(
     "serializer",
-    [JSONSerializer(), PickleSerializer(), MsgpackSerializer(), CBORSerializer()],
+    [
+        JSONSerializer(),
+        PickleSerializer(),
+        PickleSerializer(protocol=pickle.HIGHEST_PROTOCOL),
+        MsgpackSerializer(),
+        CBORSerializer(),
+    ],
 )
 @pytest.mark.parametrize(
     "data",
@@ -20,3 +35,92 @@ def test_serializer(serializer, data):
     _ = serializer.encode(data)
     assert isinstance(_, bytes)
     assert serializer.decode(_) == data
+
+
+@pytest.mark.parametrize(
+    "data, result",
+    [
+        ({1: "a"}, {"1": "a"}),
+        (2**64 + 1, 2**64 + 1),
+        (2**70 + 1, 2**70 + 1),
+        ({"a": [1, "中文"]}, {"a": [1, "中文"]}),
+    ],
+)
+def test_json_serializer(data, result):
+    serializer = JSONSerializer()
+    assert serializer.decode(serializer.encode(data)) == result
+
+
+def test_json_serializer_with_default():
+    serializer = JSONSerializer(
+        default_encode=lambda obj: {"__set__": sorted(obj)},
+        default_decode=lambda obj: set(obj["__set__"]) if "__set__" in obj else obj,
+    )
+    assert serializer.decode(serializer.encode({"a": {1, 2}})) == {"a": {1, 2}}
+
+
+def test_json_serializer_decode_nan():
+    serializer = JSONSerializer()
+    assert math.isnan(serializer.decode(b"NaN"))
+    assert serializer.decode(b"[Infinity, -Infinity]") == [
+        float("inf"),
+        -float("inf"),
+    ]
+
+
+@pytest.mark.skipif("orjson" not in sys.modules, reason="Missing orjson")
+def test_json_serializer_orjson_differences():
+    called = []
+
+    def default_encode(obj):
+        called.append(type(obj))
+        return str(obj)
+
+    serializer = JSONSerializer(default_encode=default_encode)
+    id_ = uuid.UUID(int=1)
+    assert serializer.encode([float("nan"), float("inf")]) == b"[null,null]"
+    assert serializer.encode(id_) == b'"%s"' % str(id_).encode()
+    assert called == []
+
+
+def test_json_serializer_default_encode_types():
+    @dataclasses.dataclass
+    class Point:
+        x: int
+        y: int
+
+    called = []
+
+    def default_encode(obj):
+        called.append(type(obj))
+        return str(obj)
+
+    serializer = JSONSerializer(default_encode=default_encode)
+    now = datetime.datetime.now()
+    assert serializer.decode(serializer.encode([now, Point(1, 2)])) == [
+        str(now),
+        str(Point(1, 2)),
+    ]
+    assert called == [datetime.datetime, Point]
+
+
+@pytest.mark.parametrize(
+    "headers, serializer",
+    [
+        ({"serializer": "msgpack"}, MsgpackSerializer),
+        ({"content-type": "application/json"}, JSONSerializer),
+        ({"content-type": "application/json; charset=utf-8"}, JSONSerializer),
+        ({"content-type": "application/x-cbor", "serializer": "json"}, JSONSerializer),
+    ],
+)
+def test_get_serializer(headers, serializer):
+    assert isinstance(get_serializer(headers), serializer)
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [{}, {"serializer": "application/json"}, {"content-type": "application/x-json"}],
+)
+def test_get_serializer_not_found(headers):
+    with pytest.raises(SerializerNotFound):
+        get_serializer(headers)